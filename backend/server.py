@@ -1,41 +1,171 @@
-from fastapi import FastAPI, APIRouter, HTTPException
-from fastapi.responses import StreamingResponse
+from fastapi import FastAPI, APIRouter, HTTPException, Request, BackgroundTasks
+from fastapi.responses import StreamingResponse, ORJSONResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
+from mongojet import create_client, IndexModel
 import os
 import logging
 from pathlib import Path
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
+from collections import OrderedDict
+import time
 import uuid
-from datetime import datetime
+from datetime import datetime, timezone
 import httpx
-import json
+import orjson
 import asyncio
+from contextlib import asynccontextmanager
+from urllib.parse import urlsplit, urlunsplit
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
+# MongoDB connection (opened in lifespan, mongojet clients are created asynchronously)
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+MONGO_MAX_POOL_SIZE = int(os.environ.get("MONGO_MAX_POOL_SIZE", "32"))
+db = None
 
-# Create the main app without a prefix
-app = FastAPI()
+def _with_pool_size(url: str, pool_size: int) -> str:
+    """Add maxPoolSize to a MongoDB URL unless it already sets one"""
+    parts = urlsplit(url)
+    if "maxpoolsize=" in parts.query.lower():
+        return url
+    option = f"maxPoolSize={pool_size}"
+    query = f"{parts.query}&{option}" if parts.query else option
+    # Options need a path separator even when the URL names no database
+    return urlunsplit(parts._replace(path=parts.path or "/", query=query))
 
-# Create a router with the /api prefix
-api_router = APIRouter(prefix="/api")
+# Chat history is written in batches by a background flusher instead of one
+# insert per message
+HISTORY_BATCH_SIZE = 500
+HISTORY_FLUSH_INTERVAL = 0.5
+HISTORY_QUEUE_SIZE = 10000
+# Changing this needs a collMod on the existing TTL index, create_indexes rejects
+# the same key with different options
+CHAT_HISTORY_TTL_SECONDS = 30 * 86400
+# Created in lifespan so it belongs to the running event loop
+history_queue: Optional[asyncio.Queue] = None
+
+def enqueue_chat_history(document: dict):
+    """Queue a chat history document for the next batched insert"""
+    try:
+        history_queue.put_nowait(document)
+    except asyncio.QueueFull:
+        logger.warning("Chat history queue is full, dropping entry")
+
+async def _insert_history_batch(batch: list):
+    try:
+        await db.get_collection("chat_history").insert_many(batch, ordered=False)
+    except Exception:
+        logger.exception("Failed to write %d chat history entries", len(batch))
+
+async def history_flusher():
+    """Coalesce queued chat history into insert_many batches"""
+    loop = asyncio.get_running_loop()
+    batch = []
+    inflight = None
+    try:
+        while True:
+            batch.append(await history_queue.get())
+            deadline = loop.time() + HISTORY_FLUSH_INTERVAL
+            while len(batch) < HISTORY_BATCH_SIZE:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(history_queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            # Hand the batch off before awaiting so a cancel cannot write it twice,
+            # and shield the insert so shutdown lets it finish
+            inflight = asyncio.ensure_future(_insert_history_batch(batch))
+            batch = []
+            await asyncio.shield(inflight)
+    except asyncio.CancelledError:
+        if inflight is not None and not inflight.done():
+            await inflight
+        # Flush whatever is still pending before shutting down
+        while not history_queue.empty():
+            batch.append(history_queue.get_nowait())
+        if batch:
+            await _insert_history_batch(batch)
+        raise
 
 # Ollama configuration
 OLLAMA_URL = "http://localhost:11434"
+# Ollama only runs this many generations at once, extra requests would just queue there
+OLLAMA_NUM_PARALLEL = int(os.environ.get("OLLAMA_NUM_PARALLEL", "4"))
+# How long a request may wait for a free generation slot before failing fast
+OLLAMA_QUEUE_TIMEOUT = float(os.environ.get("OLLAMA_QUEUE_TIMEOUT", "10"))
+# Created in lifespan so it belongs to the running event loop
+ollama_sem: Optional[asyncio.Semaphore] = None
+
+class OllamaBusyError(Exception):
+    """Raised when no Ollama generation slot frees up in time"""
+
+@asynccontextmanager
+async def ollama_slot():
+    """Hold one of the OLLAMA_NUM_PARALLEL generation slots"""
+    try:
+        await asyncio.wait_for(ollama_sem.acquire(), OLLAMA_QUEUE_TIMEOUT)
+    except asyncio.TimeoutError:
+        raise OllamaBusyError()
+    try:
+        yield
+    finally:
+        ollama_sem.release()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global db, history_queue, ollama_sem, _tags_lock
+    app.state.mongo = await create_client(_with_pool_size(mongo_url, MONGO_MAX_POOL_SIZE))
+    db = app.state.mongo.get_database(os.environ['DB_NAME'])
+    # Lets /chat/history walk the newest entries instead of scanning and sorting,
+    # and expires old entries so the collection and index stay RAM-resident
+    await db.get_collection("chat_history").create_indexes([
+        IndexModel(keys={"timestamp": 1}, expireAfterSeconds=CHAT_HISTORY_TTL_SECONDS)
+    ])
+    # Shared HTTP client so requests to Ollama reuse keep-alive connections
+    app.state.http = httpx.AsyncClient(
+        base_url=OLLAMA_URL,
+        timeout=httpx.Timeout(120.0, connect=5.0),
+        limits=httpx.Limits(
+            max_connections=OLLAMA_NUM_PARALLEL * 2,
+            max_keepalive_connections=OLLAMA_NUM_PARALLEL,
+            keepalive_expiry=30,
+        ),
+    )
+    history_queue = asyncio.Queue(maxsize=HISTORY_QUEUE_SIZE)
+    ollama_sem = asyncio.Semaphore(OLLAMA_NUM_PARALLEL)
+    _tags_lock = asyncio.Lock()
+    flusher = asyncio.create_task(history_flusher())
+    try:
+        yield
+    finally:
+        flusher.cancel()
+        try:
+            await flusher
+        except asyncio.CancelledError:
+            pass
+        await app.state.http.aclose()
+        # Drop the mongojet client so its connection pool is released
+        db = None
+        app.state.mongo = None
+
+# Create the main app without a prefix
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
+
+# Create a router with the /api prefix
+api_router = APIRouter(prefix="/api")
 
 # Define Models
+MAX_BATCH_MESSAGES = 16
+
 class StatusCheck(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = Field(default_factory=lambda: uuid.uuid4().hex)
     client_name: str
-    timestamp: datetime = Field(default_factory=datetime.utcnow)
+    timestamp: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 class StatusCheckCreate(BaseModel):
     client_name: str
@@ -45,17 +175,21 @@ class ChatMessage(BaseModel):
     model: Optional[str] = "llama3.2:latest"
     stream: Optional[bool] = False
 
+class BatchChatMessage(BaseModel):
+    messages: List[str] = Field(min_length=1, max_length=MAX_BATCH_MESSAGES)
+    model: Optional[str] = "llama3.2:latest"
+
 class ChatResponse(BaseModel):
     response: str
     model: str
     done: bool
 
 class ChatHistory(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = Field(default_factory=lambda: uuid.uuid4().hex)
     message: str
     response: str
     model: str
-    timestamp: datetime = Field(default_factory=datetime.utcnow)
+    timestamp: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 # Add your routes to the router instead of directly to app
 @api_router.get("/")
@@ -63,146 +197,296 @@ async def root():
     return {"message": "Hello World"}
 
 @api_router.post("/status", response_model=StatusCheck)
-async def create_status_check(input: StatusCheckCreate):
-    status_dict = input.dict()
-    status_obj = StatusCheck(**status_dict)
-    _ = await db.status_checks.insert_one(status_obj.dict())
+async def create_status_check(input: StatusCheckCreate, background: BackgroundTasks):
+    status_obj = StatusCheck(client_name=input.client_name)
+    background.add_task(db.get_collection("status_checks").insert_one, status_obj.model_dump())
     return status_obj
 
-@api_router.get("/status", response_model=List[StatusCheck])
+@api_router.get("/status")
 async def get_status_checks():
-    status_checks = await db.status_checks.find().to_list(1000)
-    return [StatusCheck(**status_check) for status_check in status_checks]
+    # Stored documents already match StatusCheck, serialize them directly
+    status_checks = await db.get_collection("status_checks").find_many({}, projection={"_id": 0}, limit=1000)
+    return ORJSONResponse(status_checks)
+
+# The model list only changes on `ollama pull/rm`, so /api/tags is shared briefly
+# between the models and health endpoints
+TAGS_CACHE_TTL = 5.0
+_tags_cache: Optional[Tuple[float, dict]] = None
+# Created in lifespan so it belongs to the running event loop
+_tags_lock: Optional[asyncio.Lock] = None
+
+async def _get_tags(client: httpx.AsyncClient) -> Tuple[int, Optional[dict]]:
+    """Fetch /api/tags from Ollama, reusing a recent successful response"""
+    global _tags_cache
+    if _tags_cache is not None and time.monotonic() - _tags_cache[0] < TAGS_CACHE_TTL:
+        return 200, _tags_cache[1]
+    async with _tags_lock:
+        # Another request may have refreshed the cache while we waited
+        if _tags_cache is not None and time.monotonic() - _tags_cache[0] < TAGS_CACHE_TTL:
+            return 200, _tags_cache[1]
+        response = await client.get("/api/tags")
+        if response.status_code != 200:
+            return response.status_code, None
+        tags = orjson.loads(response.content)
+        _tags_cache = (time.monotonic(), tags)
+        return 200, tags
 
 # Ollama integration endpoints
 @api_router.get("/ollama/models")
-async def get_ollama_models():
+async def get_ollama_models(request: Request):
     """Get available Ollama models"""
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{OLLAMA_URL}/api/tags")
-            if response.status_code == 200:
-                return response.json()
-            else:
-                raise HTTPException(status_code=response.status_code, detail="Failed to fetch models from Ollama")
+        status_code, tags = await _get_tags(request.app.state.http)
+        if status_code == 200:
+            return tags
+        else:
+            raise HTTPException(status_code=status_code, detail="Failed to fetch models from Ollama")
     except httpx.ConnectError:
         raise HTTPException(status_code=503, detail="Ollama is not running. Please start Ollama on localhost:11434")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error connecting to Ollama: {str(e)}")
 
+# Identical (model, prompt) generations share one upstream call while in flight,
+# and completed results are briefly reused
+COMPLETION_CACHE_TTL = 10.0
+COMPLETION_CACHE_SIZE = 128
+_in_flight: Dict[Tuple[str, str], asyncio.Task] = {}
+_completion_cache: "OrderedDict[Tuple[str, str], Tuple[float, dict]]" = OrderedDict()
+
+async def _generate(client: httpx.AsyncClient, model: str, prompt: str) -> dict:
+    """Run a single non-streaming generation against Ollama"""
+    payload = {
+        "model": model,
+        "prompt": prompt,
+        "stream": False
+    }
+    
+    async with ollama_slot():
+        response = await client.post("/api/generate", json=payload)
+    
+    if response.status_code != 200:
+        raise HTTPException(status_code=response.status_code, detail="Failed to get response from Ollama")
+    return orjson.loads(response.content)
+
+def _finish_generation(key: Tuple[str, str], task: asyncio.Task):
+    _in_flight.pop(key, None)
+    if task.cancelled() or task.exception() is not None:
+        return
+    _completion_cache[key] = (time.monotonic(), task.result())
+    if len(_completion_cache) > COMPLETION_CACHE_SIZE:
+        _completion_cache.popitem(last=False)
+
+async def generate_once(client: httpx.AsyncClient, model: str, prompt: str) -> dict:
+    """Generate a completion, coalescing duplicate concurrent requests"""
+    key = (model, prompt)
+    cached = _completion_cache.get(key)
+    if cached is not None:
+        if time.monotonic() - cached[0] < COMPLETION_CACHE_TTL:
+            return cached[1]
+        del _completion_cache[key]
+    
+    task = _in_flight.get(key)
+    joined = task is not None
+    if not joined:
+        task = asyncio.create_task(_generate(client, model, prompt))
+        task.add_done_callback(lambda t: _finish_generation(key, t))
+        _in_flight[key] = task
+    try:
+        # Shield so a disconnecting caller does not cancel the shared generation
+        return await asyncio.shield(task)
+    except OllamaBusyError:
+        # A caller that joined late has not waited the full OLLAMA_QUEUE_TIMEOUT
+        # itself, so it retries through a new task instead of sharing the failure
+        if not joined:
+            raise
+        return await generate_once(client, model, prompt)
+
 @api_router.post("/ollama/chat")
-async def chat_with_ollama(chat_request: ChatMessage):
+async def chat_with_ollama(chat_request: ChatMessage, request: Request):
     """Chat with Ollama model"""
+    model = chat_request.model or "llama3.2:latest"
     try:
-        # Save message to database
-        chat_history = ChatHistory(
-            message=chat_request.message,
-            response="",  # Will be filled after response
-            model=chat_request.model or "llama3.2:latest"
+        result = await generate_once(request.app.state.http, model, chat_request.message)
+        chat_response = ChatResponse(
+            response=result.get("response", ""),
+            model=model,
+            done=result.get("done", True)
         )
         
-        async with httpx.AsyncClient(timeout=120.0) as client:
-            payload = {
-                "model": chat_request.model or "llama3.2:latest",
-                "prompt": chat_request.message,
-                "stream": False
-            }
-            
-            response = await client.post(f"{OLLAMA_URL}/api/generate", json=payload)
-            
-            if response.status_code == 200:
-                result = response.json()
-                chat_response = ChatResponse(
-                    response=result.get("response", ""),
-                    model=result.get("model", chat_request.model or "llama3.2:latest"),
-                    done=result.get("done", True)
-                )
-                
-                # Update chat history with response
-                chat_history.response = chat_response.response
-                await db.chat_history.insert_one(chat_history.dict())
-                
-                return chat_response
-            else:
-                raise HTTPException(status_code=response.status_code, detail="Failed to get response from Ollama")
+        # Save message and response to database
+        enqueue_chat_history(ChatHistory(
+            message=chat_request.message,
+            response=chat_response.response,
+            model=model
+        ).model_dump())
+        
+        return chat_response
                 
+    except OllamaBusyError:
+        raise HTTPException(status_code=503, detail="Ollama is busy, please try again shortly")
     except httpx.ConnectError:
         raise HTTPException(status_code=503, detail="Ollama is not running. Please start Ollama on localhost:11434")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error communicating with Ollama: {str(e)}")
 
-async def generate_streaming_response(model: str, prompt: str):
+def _batch_error(exc: BaseException) -> str:
+    """Describe a failed batch item the way the single-message endpoint would"""
+    if isinstance(exc, OllamaBusyError):
+        return "Ollama is busy, please try again shortly"
+    if isinstance(exc, httpx.ConnectError):
+        return "Ollama is not running. Please start Ollama on localhost:11434"
+    if isinstance(exc, HTTPException):
+        return exc.detail
+    return f"Error communicating with Ollama: {str(exc)}"
+
+@api_router.post("/ollama/chat/batch")
+async def batch_chat_with_ollama(batch_request: BatchChatMessage, request: Request):
+    """Chat with Ollama model for several messages in parallel"""
+    model = batch_request.model or "llama3.2:latest"
+    # Items only ask for an Ollama slot when they are about to run, so the batch
+    # never queues behind itself long enough to hit OLLAMA_QUEUE_TIMEOUT
+    batch_sem = asyncio.Semaphore(OLLAMA_NUM_PARALLEL)
+    
+    async def run(message: str) -> dict:
+        async with batch_sem:
+            return await generate_once(request.app.state.http, model, message)
+    
+    # Failures are reported per item so finished generations are still returned and saved
+    results = await asyncio.gather(*[
+        run(message) for message in batch_request.messages
+    ], return_exceptions=True)
+    
+    # Items have the ChatResponse shape, built as plain dicts to skip per-item validation
+    responses = []
+    for message, result in zip(batch_request.messages, results):
+        if isinstance(result, BaseException):
+            responses.append({"error": _batch_error(result)})
+            continue
+        response_text = result.get("response", "")
+        enqueue_chat_history(ChatHistory(
+            message=message,
+            response=response_text,
+            model=model
+        ).model_dump())
+        responses.append({
+            "response": response_text,
+            "model": model,
+            "done": result.get("done", True)
+        })
+    
+    return ORJSONResponse(responses)
+
+# SSE framing
+DATA_PREFIX = b"data: "
+TAIL = b"\n\n"
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "Connection": "keep-alive",
+    "Access-Control-Allow-Origin": "*",
+    "Access-Control-Allow-Headers": "*",
+}
+# Constant parts of the final frame, only the response text is serialized per stream
+DONE_FRAME_HEAD = DATA_PREFIX + b'{"response":'
+DONE_FRAME_TAIL = b',"done":true}' + TAIL
+# Fixed error frames are serialized once at import
+SSE_ERR_FAIL = DATA_PREFIX + orjson.dumps({'error': 'Failed to get response from Ollama'}) + TAIL
+SSE_ERR_OFFLINE = DATA_PREFIX + orjson.dumps({'error': 'Ollama is not running. Please start Ollama on localhost:11434'}) + TAIL
+SSE_ERR_BUSY = DATA_PREFIX + orjson.dumps({'error': 'Ollama is busy, please try again shortly'}) + TAIL
+
+async def _ndjson_lines(response: httpx.Response):
+    """Split an NDJSON body on raw bytes rather than letting httpx decode every chunk"""
+    buf = b""
+    async for data in response.aiter_bytes():
+        buf += data
+        while (nl := buf.find(b"\n")) != -1:
+            line, buf = buf[:nl].rstrip(b"\r"), buf[nl + 1:]
+            if line:
+                yield line
+    # Like aiter_lines, keep a last line that has no trailing newline
+    buf = buf.rstrip(b"\r")
+    if buf:
+        yield buf
+
+async def generate_streaming_response(client: httpx.AsyncClient, model: str, prompt: str):
     """Generate streaming response from Ollama"""
     try:
-        async with httpx.AsyncClient(timeout=120.0) as client:
-            payload = {
-                "model": model,
-                "prompt": prompt,
-                "stream": True
-            }
-            
-            async with client.stream('POST', f"{OLLAMA_URL}/api/generate", json=payload) as response:
+        payload = {
+            "model": model,
+            "prompt": prompt,
+            "stream": True
+        }
+        
+        async with ollama_slot():
+            async with client.stream('POST', "/api/generate", json=payload) as response:
                 if response.status_code == 200:
-                    full_response = ""
-                    async for chunk in response.aiter_lines():
-                        if chunk:
+                    parts = []
+                    async for line in _ndjson_lines(response):
+                        # Intermediate chunks already carry "response"/"done", so they are
+                        # forwarded as-is without being re-serialized
+                        if b'"done":true' not in line:
+                            yield DATA_PREFIX + line + TAIL
+                            # Parsed only after the frame is handed off, keeping just the
+                            # text chat history needs
                             try:
-                                data = json.loads(chunk)
-                                if "response" in data:
-                                    full_response += data["response"]
-                                    yield f"data: {json.dumps({'response': data['response'], 'done': data.get('done', False)})}\n\n"
-                                if data.get("done", False):
-                                    # Save to database when done
-                                    chat_history = ChatHistory(
-                                        message=prompt,
-                                        response=full_response,
-                                        model=model
-                                    )
-                                    await db.chat_history.insert_one(chat_history.dict())
-                                    break
-                            except json.JSONDecodeError:
-                                continue
+                                parts.append(orjson.loads(line).get("response", ""))
+                            except orjson.JSONDecodeError:
+                                logger.warning("Skipping malformed Ollama stream line in chat history")
+                            continue
+                        try:
+                            final = orjson.loads(line)
+                        except orjson.JSONDecodeError:
+                            logger.warning("Skipping malformed final Ollama stream line")
+                            continue
+                        yield DONE_FRAME_HEAD + orjson.dumps(final.get('response', '')) + DONE_FRAME_TAIL
+                        # Save to database when done
+                        parts.append(final.get("response", ""))
+                        chat_history = ChatHistory(
+                            message=prompt,
+                            response="".join(parts),
+                            model=model
+                        )
+                        enqueue_chat_history(chat_history.model_dump())
+                        break
                 else:
-                    yield f"data: {json.dumps({'error': 'Failed to get response from Ollama'})}\n\n"
+                    yield SSE_ERR_FAIL
+    except OllamaBusyError:
+        yield SSE_ERR_BUSY
     except httpx.ConnectError:
-        yield f"data: {json.dumps({'error': 'Ollama is not running. Please start Ollama on localhost:11434'})}\n\n"
+        yield SSE_ERR_OFFLINE
     except Exception as e:
-        yield f"data: {json.dumps({'error': f'Error communicating with Ollama: {str(e)}'})}\n\n"
+        yield DATA_PREFIX + orjson.dumps({'error': f'Error communicating with Ollama: {str(e)}'}) + TAIL
 
 @api_router.post("/ollama/chat/stream")
-async def stream_chat_with_ollama(chat_request: ChatMessage):
+async def stream_chat_with_ollama(chat_request: ChatMessage, request: Request):
     """Stream chat with Ollama model"""
     return StreamingResponse(
         generate_streaming_response(
+            request.app.state.http,
             chat_request.model or "llama3.2:latest",
             chat_request.message
         ),
         media_type="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
-            "Access-Control-Allow-Origin": "*",
-            "Access-Control-Allow-Headers": "*",
-        }
+        headers=SSE_HEADERS
     )
 
 @api_router.get("/ollama/health")
-async def check_ollama_health():
+async def check_ollama_health(request: Request):
     """Check if Ollama is running and accessible"""
     try:
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            response = await client.get(f"{OLLAMA_URL}/api/tags")
-            if response.status_code == 200:
-                models = response.json()
-                return {
-                    "status": "healthy",
-                    "models_available": len(models.get("models", [])),
-                    "models": models.get("models", [])
-                }
-            else:
-                return {"status": "unhealthy", "error": "Ollama responded with error"}
+        # The timeout also covers waiting on a refresh started by /ollama/models
+        status_code, models = await asyncio.wait_for(_get_tags(request.app.state.http), 5.0)
+        if status_code == 200:
+            return {
+                "status": "healthy",
+                "models_available": len(models.get("models", [])),
+                "models": models.get("models", [])
+            }
+        else:
+            return {"status": "unhealthy", "error": "Ollama responded with error"}
     except httpx.ConnectError:
         return {"status": "offline", "error": "Ollama is not running on localhost:11434"}
+    except asyncio.TimeoutError:
+        return {"status": "error", "error": "Timed out waiting for Ollama"}
     except Exception as e:
         return {"status": "error", "error": str(e)}
 
@@ -210,8 +494,11 @@ async def check_ollama_health():
 async def get_chat_history():
     """Get chat history from database"""
     try:
-        history = await db.chat_history.find().sort("timestamp", -1).limit(50).to_list(50)
-        return [ChatHistory(**chat) for chat in history]
+        # Stored documents already match ChatHistory, serialize them directly
+        history = await db.get_collection("chat_history").find_many(
+            {}, projection={"_id": 0}, sort={"timestamp": -1}, limit=50
+        )
+        return ORJSONResponse(history)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching chat history: {str(e)}")
 
@@ -232,7 +519,3 @@ logging.basicConfig(
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 logger = logging.getLogger(__name__)
-
-@app.on_event("shutdown")
-async def shutdown_db_client():
-    client.close()
\ No newline at end of file